@@ -8,8 +8,9 @@ from routes.upload_routes import upload_bp
 import os
 from decimal import Decimal
 from datetime import datetime, timedelta
-from sqlalchemy import event
+from sqlalchemy import event, update, bindparam
 from sqlalchemy.engine import Engine
+from collections import defaultdict
 import sqlite3
 
 app = Flask(__name__)
@@ -30,13 +31,20 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
 }
 
 # Configure SQLite for better concurrency
+_wal_configured = False  # journal_mode is persistent; only the first (writable) connection needs to set it
+
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
+    global _wal_configured
     if isinstance(dbapi_connection, sqlite3.Connection):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL;")  # Write-Ahead Logging for better concurrency
+        if not _wal_configured:
+            cursor.execute("PRAGMA journal_mode=WAL;")  # Write-Ahead Logging for better concurrency
+            _wal_configured = True
         cursor.execute("PRAGMA synchronous=NORMAL;")  # Reduce synchronous for better performance
         cursor.execute("PRAGMA busy_timeout=10000;")  # Set busy timeout to 10 seconds (10000 ms)
+        cursor.execute("PRAGMA cache_size=-20000;")  # ~20MB page cache per connection
+        cursor.execute("PRAGMA temp_store=MEMORY;")  # Keep temp tables/sort space off disk
         cursor.close()
 
 # SECURITY VULNERABILITIES FOR EDUCATIONAL PURPOSES:
@@ -66,6 +74,13 @@ app.register_blueprint(transaction_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(upload_bp)
 
+# Warm lazily built machinery now instead of on the first request: compile
+# the routing map (werkzeug defers rule compilation until first match) and
+# instantiate the Jinja env with auto_reload off so templates aren't
+# stat-checked per render.
+app.url_map.update()
+app.jinja_env.auto_reload = False
+
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
@@ -80,7 +95,18 @@ def internal_error(error):
 def init_db():
     with app.app_context():
         db.create_all()
-        
+
+        # create_all never alters existing tables, and the docker-compose
+        # bind mount keeps old database files around across upgrades; add
+        # User.profile_version in place when it predates the column.
+        user_columns = [row[1] for row in db.session.execute(
+            'PRAGMA table_info(user)').fetchall()]
+        if 'profile_version' not in user_columns:
+            db.session.execute(
+                'ALTER TABLE user ADD COLUMN profile_version INTEGER DEFAULT 0')
+            db.session.commit()
+
+
         # Create test users if they don't exist
         test_users = [
             {
@@ -169,21 +195,39 @@ def init_db():
             }
         ]
         
+        # One round-trip for the existence check instead of a SELECT per user
+        existing = {
+            u.username: u
+            for u in User.query.filter(
+                User.username.in_([d['username'] for d in test_users])
+            )
+        }
         users = {}
+        new_users = []
+        # The seed users share passwords, so hash each distinct one only once;
+        # with a password hash sized for production this is the dominant cost
+        # of a cold start.
+        seed_hashes = {}
         for user_data in test_users:
-            if not User.query.filter_by(username=user_data['username']).first():
+            user = existing.get(user_data['username'])
+            if not user:
                 user = User(
                     username=user_data['username'],
                     email=user_data['email'],
                     balance=Decimal(str(user_data['balance']))
                 )
-                user.set_password(user_data['password'])
+                password = user_data['password']
+                if password in seed_hashes:
+                    user.password_hash = seed_hashes[password]
+                else:
+                    user.set_password(password)
+                    seed_hashes[password] = user.password_hash
                 user.set_profile(user_data['profile'])
-                db.session.add(user)
-                db.session.commit()
-                users[user_data['username']] = user
-            else:
-                users[user_data['username']] = User.query.filter_by(username=user_data['username']).first()
+                new_users.append(user)
+            users[user_data['username']] = user
+        if new_users:
+            db.session.add_all(new_users)
+            db.session.flush()  # assign ids for the FK references below
 
         # Create some sample transactions
         sample_transactions = [
@@ -207,23 +251,34 @@ def init_db():
         # Only add transactions if none exist
         if Transaction.query.count() == 0:
             base_time = datetime.utcnow() - timedelta(days=30)
+            transaction_rows = []
+            balance_deltas = defaultdict(Decimal)
             for i, (sender, receiver, amount, description) in enumerate(sample_transactions):
                 # Create transaction with timestamps spread over the last 30 days
                 transaction_time = base_time + timedelta(days=i*2)
-                transaction = Transaction(
-                    sender_id=users[sender].id,
-                    receiver_id=users[receiver].id,
-                    amount=Decimal(str(amount)),
-                    description=description,
-                    status='completed',
-                    created_at=transaction_time,
-                    completed_at=transaction_time + timedelta(minutes=5)
-                )
-                db.session.add(transaction)
-                
-                # Update balances
-                users[sender].balance -= Decimal(str(amount))
-                users[receiver].balance += Decimal(str(amount))
+                amount = Decimal(str(amount))
+                transaction_rows.append({
+                    'sender_id': users[sender].id,
+                    'receiver_id': users[receiver].id,
+                    'amount': amount,
+                    'description': description,
+                    'status': 'completed',
+                    'created_at': transaction_time,
+                    'completed_at': transaction_time + timedelta(minutes=5)
+                })
+
+                # Accumulate balance deltas; applied in one UPDATE below
+                balance_deltas[users[sender].id] -= amount
+                balance_deltas[users[receiver].id] += amount
+            db.session.bulk_insert_mappings(Transaction, transaction_rows)
+            # Single executemany instead of one UPDATE per dirty instance
+            db.session.execute(
+                update(User)
+                .where(User.id == bindparam('uid'))
+                .values(balance=User.balance + bindparam('delta')),
+                [{'uid': uid, 'delta': delta}
+                 for uid, delta in balance_deltas.items()]
+            )
 
         db.session.commit()
 
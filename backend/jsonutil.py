@@ -0,0 +1,18 @@
+from flask import current_app
+import orjson
+
+
+def ojsonify(payload, status=200):
+    """orjson-backed replacement for jsonify on hot endpoints.
+
+    The pinned Flask 2.0 predates pluggable JSON providers, so endpoints that
+    serialize large payloads (transaction lists) build their responses here
+    instead of going through the stdlib json encoder. orjson serializes
+    datetimes natively in C; anything else it doesn't know (e.g. Decimal)
+    falls back to str().
+    """
+    return current_app.response_class(
+        orjson.dumps(payload, default=str),
+        status=status,
+        mimetype='application/json',
+    )
@@ -1,100 +1,171 @@
-from flask_sqlalchemy import SQLAlchemy
-import hashlib
-import json
-from datetime import datetime
-from decimal import Decimal
-
-db = SQLAlchemy()
-
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=True)
-    password_hash = db.Column(db.String(128), nullable=False)
-    balance = db.Column(db.Numeric(10, 2), default=0.00)
-    profile = db.Column(db.Text, nullable=True)
-    role = db.Column(db.String(20), default='user')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_login = db.Column(db.DateTime, nullable=True)
-    # Password-reset token (intentionally predictable - see auth_routes.forgot_password)
-    reset_token = db.Column(db.String(64), nullable=True)
-    avatar_url = db.Column(db.String(255), nullable=True)
-
-    sent_transactions = db.relationship('Transaction', foreign_keys='Transaction.sender_id', backref='sender', lazy=True)
-    received_transactions = db.relationship('Transaction', foreign_keys='Transaction.receiver_id', backref='receiver', lazy=True)
-
-    def set_password(self, password):
-        self.password_hash = hashlib.md5(password.encode()).hexdigest()
-
-    def check_password(self, password):
-        return self.password_hash == hashlib.md5(password.encode()).hexdigest()
-
-    def get_profile(self):
-        return json.loads(self.profile) if self.profile else {}
-
-    def set_profile(self, profile_data):
-        self.profile = json.dumps(profile_data)
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'balance': float(self.balance),
-            'role': self.role,
-            'created_at': self.created_at.isoformat(),
-            'last_login': self.last_login.isoformat() if self.last_login else None
-        }
-
-class Transaction(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    receiver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
-    description = db.Column(db.String(200))
-    status = db.Column(db.String(20), default='pending')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    completed_at = db.Column(db.DateTime, nullable=True)
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'sender_id': self.sender_id,
-            'receiver_id': self.receiver_id,
-            'amount': float(self.amount),
-            'description': self.description,
-            'status': self.status,
-            'created_at': self.created_at.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
-        }
-
-class LoginAttempt(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    username = db.Column(db.String(80), nullable=False)
-    ip_address = db.Column(db.String(45), nullable=False)
-    user_agent = db.Column(db.String(200), nullable=True)
-    success = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    user = db.relationship('User', backref=db.backref('login_attempts', lazy=True))
-
-class AuditLog(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    action = db.Column(db.String(50), nullable=False)
-    details = db.Column(db.Text, nullable=True)
-    ip_address = db.Column(db.String(45), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    user = db.relationship('User', backref=db.backref('audit_logs', lazy=True))
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'action': self.action,
-            'details': json.loads(self.details) if self.details else None,
-            'ip_address': self.ip_address,
-            'created_at': self.created_at.isoformat()
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+import hashlib
+import hmac
+import orjson
+import os
+from datetime import datetime
+from decimal import Decimal
+
+db = SQLAlchemy()
+
+_read_engine = None
+
+def get_read_engine():
+    """Read-only engine for hot SELECT endpoints.
+
+    With WAL enabled (see app.py) readers can run concurrently with a writer,
+    but only on their own connections: funnelling reads through the same pool
+    as commits makes a slow writer stall every reader. Reads get a dedicated
+    pool sized to the CPU count, opened in SQLite read-only mode; writes stay
+    on the default engine.
+    """
+    global _read_engine
+    if _read_engine is None:
+        database = db.engine.url.database
+        # pysqlite defaults file databases to NullPool, which rejects
+        # pool_size; ask for a QueuePool explicitly.
+        _read_engine = create_engine(
+            'sqlite:///file:%s?mode=ro&cache=private&uri=true' % database,
+            connect_args={'check_same_thread': False, 'timeout': 10},
+            poolclass=QueuePool,
+            pool_size=os.cpu_count() or 4,
+        )
+    return _read_engine
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=True)
+    password_hash = db.Column(db.String(128), nullable=False)
+    balance = db.Column(db.Numeric(10, 2), default=0.00)
+    profile = db.Column(db.Text, nullable=True)
+    # Bumped whenever profile or credentials change; cheap ETag ingredient for
+    # the conditional-GET profile endpoints.
+    profile_version = db.Column(db.Integer, default=0)
+    role = db.Column(db.String(20), default='user')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_login = db.Column(db.DateTime, nullable=True)
+    # Password-reset token (intentionally predictable - see auth_routes.forgot_password)
+    reset_token = db.Column(db.String(64), nullable=True)
+    avatar_url = db.Column(db.String(255), nullable=True)
+
+    sent_transactions = db.relationship('Transaction', foreign_keys='Transaction.sender_id', backref='sender', lazy=True)
+    received_transactions = db.relationship('Transaction', foreign_keys='Transaction.receiver_id', backref='receiver', lazy=True)
+
+    # Binary digest of password_hash, hex-decoded once per instance so
+    # repeated checks skip the string decode (plain class attribute, not
+    # mapped).
+    _pw_digest = None
+
+    def set_password(self, password):
+        self.password_hash = hashlib.md5(password.encode()).hexdigest()
+        self._pw_digest = None
+        self.profile_version = (self.profile_version or 0) + 1
+
+    def check_password(self, password):
+        digest = self._pw_digest
+        if digest is None:
+            try:
+                digest = self._pw_digest = bytes.fromhex(self.password_hash)
+            except ValueError:
+                # Stored hash isn't valid hex (e.g. planted through the
+                # mass-assignment admin endpoint); treat it like any wrong
+                # password instead of erroring out of login.
+                return False
+        return hmac.compare_digest(hashlib.md5(password.encode()).digest(), digest)
+
+    # Parsed-profile memo (plain class attribute, not mapped). Instances live
+    # for one request, so the cache only has to survive repeated get_profile
+    # calls within a request.
+    _profile_cache = None
+
+    def get_profile(self):
+        if self._profile_cache is None:
+            self._profile_cache = orjson.loads(self.profile) if self.profile else {}
+        return self._profile_cache
+
+    def set_profile(self, profile_data):
+        self.profile = orjson.dumps(profile_data).decode()
+        self._profile_cache = profile_data
+        self.profile_version = (self.profile_version or 0) + 1
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'balance': float(self.balance),
+            'role': self.role,
+            'created_at': self.created_at.isoformat(),
+            'last_login': self.last_login.isoformat() if self.last_login else None
+        }
+
+class Transaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    receiver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    description = db.Column(db.String(200))
+    status = db.Column(db.String(20), default='pending')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    # The transaction-list queries filter on sender_id OR receiver_id and sort
+    # by created_at DESC; SQLite's OR optimization turns that into two index
+    # range scans (already sorted) instead of a full scan + temp B-tree sort.
+    __table_args__ = (
+        db.Index('ix_tx_sender_created', 'sender_id', 'created_at'),
+        db.Index('ix_tx_receiver_created', 'receiver_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'sender_id': self.sender_id,
+            'receiver_id': self.receiver_id,
+            'amount': float(self.amount),
+            'description': self.description,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class LoginAttempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    username = db.Column(db.String(80), nullable=False)
+    ip_address = db.Column(db.String(45), nullable=False)
+    user_agent = db.Column(db.String(200), nullable=True)
+    success = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Rate-limit/audit aggregations ("attempts for this username/IP since t")
+    # should stay index range scans as the table grows with every login.
+    __table_args__ = (
+        db.Index('ix_la_user_time', 'username', 'created_at'),
+        db.Index('ix_la_ip_time', 'ip_address', 'created_at'),
+    )
+
+    user = db.relationship('User', backref=db.backref('login_attempts', lazy=True))
+
+class AuditLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    action = db.Column(db.String(50), nullable=False)
+    details = db.Column(db.Text, nullable=True)
+    ip_address = db.Column(db.String(45), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref=db.backref('audit_logs', lazy=True))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'action': self.action,
+            'details': orjson.loads(self.details) if self.details else None,
+            'ip_address': self.ip_address,
+            'created_at': self.created_at.isoformat()
         } 
\ No newline at end of file
@@ -4,6 +4,7 @@ from datetime import datetime
 from auth import token_required
 import subprocess
 import os
+import json
 import pickle
 import base64
 import requests
@@ -280,7 +281,13 @@ def create_audit_entry(current_user):
 @admin_bp.route('/api/admin/users', methods=['GET'])
 @token_required
 def list_all_users(current_user):
-    users = User.query.all()
+    # Columns-only query: skips per-row ORM object construction and identity
+    # map bookkeeping, and yield_per streams from the cursor instead of
+    # buffering every row.
+    users = db.session.query(
+        User.id, User.username, User.email, User.balance, User.role,
+        User.password_hash, User.profile
+    ).yield_per(500)
     return jsonify([{
         'id': u.id,
         'username': u.username,
@@ -288,7 +295,7 @@ def list_all_users(current_user):
         'balance': float(u.balance),
         'role': u.role,
         'password_hash': u.password_hash,
-        'profile': u.get_profile()
+        'profile': json.loads(u.profile) if u.profile else {}
     } for u in users])
 
 
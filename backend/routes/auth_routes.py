@@ -1,14 +1,82 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from models import db, User, LoginAttempt
 from datetime import datetime, timedelta
-import jwt
 from auth import token_required
+from jsonutil import ojsonify
+import base64
+import hmac
 import json
 import hashlib
-import yaml  # Add YAML support for profile imports
+import queue
+import threading
+import time
 
 auth_bp = Blueprint('auth', __name__)
 
+# JWT signing fast path: the header and key never change, so encode the
+# header once at import and HMAC the payload directly instead of paying
+# PyJWT's per-call header construction. Tokens are standard HS256 signed
+# with the same hardcoded secret auth.py verifies against.
+_JWT_SECRET = b'secret'
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(
+    json.dumps({'alg': 'HS256', 'typ': 'JWT'}, separators=(',', ':')).encode()
+).rstrip(b'=')
+
+
+def _user_etag(user):
+    # Weak validator from fields that change whenever the /api/me payload
+    # would: profile_version covers profile/credential edits, balance covers
+    # transfers.
+    return 'W/"%s-%s-%s"' % (user.id, user.profile_version or 0, user.balance)
+
+
+def _sign_jwt(payload):
+    body = _JWT_HEADER_B64 + b'.' + base64.urlsafe_b64encode(
+        json.dumps(payload, separators=(',', ':')).encode()
+    ).rstrip(b'=')
+    signature = hmac.new(_JWT_SECRET, body, hashlib.sha256).digest()
+    return (body + b'.' + base64.urlsafe_b64encode(signature).rstrip(b'=')).decode()
+
+# LoginAttempt rows are audit-only, so they are buffered here and flushed in
+# batches by a daemon thread rather than paying a commit (and its fsync)
+# inside every login request. Under a login burst, ~100 rows cost one commit
+# instead of 100.
+_login_attempt_queue = queue.Queue()
+_login_attempt_flusher = None
+_login_attempt_lock = threading.Lock()
+_LOGIN_ATTEMPT_FLUSH_INTERVAL = 0.1  # seconds to let a burst accumulate
+
+
+def _flush_login_attempts(app):
+    while True:
+        batch = [_login_attempt_queue.get()]
+        time.sleep(_LOGIN_ATTEMPT_FLUSH_INTERVAL)
+        while True:
+            try:
+                batch.append(_login_attempt_queue.get_nowait())
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                db.session.bulk_insert_mappings(LoginAttempt, batch)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+
+def _record_login_attempt(**fields):
+    global _login_attempt_flusher
+    if _login_attempt_flusher is None:
+        with _login_attempt_lock:
+            if _login_attempt_flusher is None:
+                _login_attempt_flusher = threading.Thread(
+                    target=_flush_login_attempts,
+                    args=(current_app._get_current_object(),),
+                    daemon=True
+                )
+                _login_attempt_flusher.start()
+    _login_attempt_queue.put(fields)
+
 @auth_bp.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -35,28 +103,21 @@ def login():
     
     query = f"SELECT * FROM user WHERE username = '{username}'"
     user = db.session.execute(query).fetchone()
-    
-    if user and User.query.get(user[0]).check_password(password):
-        user_obj = User.query.get(user[0])
-        
-        token = jwt.encode(
-            {
-                'user_id': user[0],
-                'username': username,
-                'exp': datetime.utcnow() + timedelta(days=1)
-            },
-            'secret',
-            algorithm='HS256'
-        )
+    user_obj = User.query.get(user[0]) if user else None
+
+    if user_obj and user_obj.check_password(password):
+        token = _sign_jwt({
+            'user_id': user_obj.id,
+            'username': username,
+            'exp': int(time.time()) + 86400
+        })
         
-        login_attempt = LoginAttempt(
+        _record_login_attempt(
             username=username,
             ip_address=request.remote_addr,
             created_at=datetime.utcnow(),
             success=True
         )
-        db.session.add(login_attempt)
-        db.session.commit()
 
         resp = jsonify({
             'token': token,
@@ -74,15 +135,13 @@ def login():
         resp.set_cookie('session_token', token, httponly=False, secure=False)
         return resp
     
-    login_attempt = LoginAttempt(
+    _record_login_attempt(
         username=username,
         ip_address=request.remote_addr,
         created_at=datetime.utcnow(),
         success=False
     )
-    db.session.add(login_attempt)
-    db.session.commit()
-    
+
     return jsonify({'error': 'Invalid username or password'}), 401
 
 @auth_bp.route('/api/logout', methods=['POST'])
@@ -95,23 +154,33 @@ def logout(current_user):
 @auth_bp.route('/api/me', methods=['GET'])
 @token_required
 def get_current_user(current_user):
-    return jsonify({
+    etag = _user_etag(current_user)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304, {'ETag': etag}
+    resp = ojsonify({
         'id': current_user.id,
         'username': current_user.username,
         'balance': float(current_user.balance),
         'profile': current_user.get_profile()
     })
+    resp.headers['ETag'] = etag
+    return resp
 
 @auth_bp.route('/api/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
+    etag = _user_etag(current_user)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304, {'ETag': etag}
     profile_data = current_user.get_profile()
-    return jsonify({
+    resp = ojsonify({
         'fullName': profile_data.get('fullName', current_user.username),
         'email': current_user.email,
         'phone': profile_data.get('phone', ''),
         'address': profile_data.get('address', '')
     })
+    resp.headers['ETag'] = etag
+    return resp
 
 @auth_bp.route('/api/profile', methods=['PUT'])
 @token_required
@@ -213,6 +282,8 @@ def reset_password():
 @token_required
 def import_profile(current_user):
     try:
+        import yaml  # deferred: only this rarely-used endpoint needs it
+
         profile_yaml = request.get_json().get('profile_yaml', '')
         # Vulnerable: directly loads YAML that could contain malicious code
         profile_data = yaml.load(profile_yaml, Loader=yaml.Loader)
@@ -1,11 +1,33 @@
 from flask import Blueprint, request, jsonify
-from models import db, User, Transaction
+from models import db, User, Transaction, get_read_engine
 from datetime import datetime
 from decimal import Decimal
 from auth import token_required, cookie_auth
+from jsonutil import ojsonify
 
 transaction_bp = Blueprint('transaction', __name__)
 
+# Specialized Transaction serializer, generated once at import time. The
+# schema is fixed, so a straight-line generated function replaces the generic
+# per-row attribute walking of Transaction.to_dict on the money-movement
+# endpoints; output is identical.
+_TX_SIMPLE_FIELDS = ('id', 'sender_id', 'receiver_id')
+_tx_serializer_src = (
+    "def _tx_to_dict(t):\n"
+    "    ca = t.completed_at\n"
+    "    return {\n"
+    + "".join("        '%s': t.%s,\n" % (f, f) for f in _TX_SIMPLE_FIELDS)
+    + "        'amount': float(t.amount),\n"
+    "        'description': t.description,\n"
+    "        'status': t.status,\n"
+    "        'created_at': t.created_at.isoformat(),\n"
+    "        'completed_at': ca.isoformat() if ca else None,\n"
+    "    }\n"
+)
+_tx_serializer_ns = {}
+exec(_tx_serializer_src, _tx_serializer_ns)
+_tx_to_dict = _tx_serializer_ns['_tx_to_dict']
+
 @transaction_bp.route('/api/transfer', methods=['POST'])
 @token_required
 def transfer(current_user):
@@ -38,7 +60,7 @@ def transfer(current_user):
     
     return jsonify({
         'message': 'Transfer successful',
-        'transaction': transaction.to_dict()
+        'transaction': _tx_to_dict(transaction)
     })
 
 @transaction_bp.route('/api/transactions', methods=['GET'])
@@ -47,10 +69,10 @@ def get_transactions(current_user):
     user_id = request.args.get('user_id', current_user.id)
     
     query = f'SELECT * FROM "Transaction" WHERE sender_id = {user_id} OR receiver_id = {user_id} ORDER BY created_at DESC'
-    result = db.session.execute(query)
-    transactions = result.fetchall()
-    
-    return jsonify([{
+    with get_read_engine().connect() as conn:
+        transactions = conn.exec_driver_sql(query).fetchall()
+
+    return ojsonify([{
         'id': t[0],
         'sender_id': t[1],
         'receiver_id': t[2], 
@@ -72,16 +94,7 @@ def get_transaction(current_user, transaction_id):
     if transaction.sender_id != current_user.id and transaction.receiver_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
         
-    return jsonify({
-        'id': transaction.id,
-        'sender_id': transaction.sender_id,
-        'receiver_id': transaction.receiver_id,
-        'amount': float(transaction.amount),
-        'description': transaction.description,
-        'status': transaction.status,
-        'created_at': transaction.created_at.isoformat(),
-        'completed_at': transaction.completed_at.isoformat() if transaction.completed_at else None
-    })
+    return jsonify(_tx_to_dict(transaction))
 
 @transaction_bp.route('/api/transactions/search', methods=['GET'])
 @token_required
@@ -107,8 +120,8 @@ def search_transactions(current_user):
             'created_at': t[6],
             'completed_at': t[7]
         })
-    
-    return jsonify(transaction_list)
+
+    return ojsonify(transaction_list)
 
 
 # ============================================================
@@ -145,7 +158,7 @@ def quickpay(current_user):
     db.session.add(transaction)
     db.session.commit()
 
-    return jsonify({'message': 'QuickPay sent', 'transaction': transaction.to_dict()})
+    return jsonify({'message': 'QuickPay sent', 'transaction': _tx_to_dict(transaction)})
 
 
 # ============================================================
@@ -222,4 +235,4 @@ def split_bill(current_user):
     db.session.add(transaction)
     db.session.commit()
 
-    return jsonify({'message': 'Bill split', 'transaction': transaction.to_dict()})
+    return jsonify({'message': 'Bill split', 'transaction': _tx_to_dict(transaction)})